@@ -11,14 +11,14 @@ from config import (
 )
 from utils import (
     load_portfolio_data, save_portfolio_data, get_item_by_id,
-    generate_id, save_cv_file, delete_cv_file, export_portfolio_data,
+    generate_id, save_cv_file, delete_cv_file, export_portfolio_data, export_portfolio_db,
     import_portfolio_data, allowed_file, save_screenshot, delete_screenshot,
     load_analytics_data, track_page_view, track_section_view, get_analytics_summary, reset_analytics,
-    generate_slug, get_db
+    generate_slug, get_db, invalidate_portfolio_cache, get_cache_stats
 )
 from i18n import (
     get_current_language, set_language, get_translation,
-    get_translations_for_language, update_translation,
+    get_translations_for_language, update_translations,
     load_translations, SUPPORTED_LANGUAGES, DEFAULT_LANGUAGE
 )
 
@@ -78,6 +78,15 @@ def track_analytics():
     elif route == '/blog' or route.startswith('/blog/'):
         track_section_view(ANALYTICS_DATA_PATH, 'blog')
 
+@app.after_request
+def invalidate_cached_portfolio(response):
+    """Drop cached portfolio data after any request that may have changed it"""
+    # Admin pages write through get_db() directly (some even on GET, e.g. marking
+    # a message as read), and public POSTs such as the contact form add rows.
+    if request.method not in ('GET', 'HEAD') or request.path.startswith('/admin'):
+        invalidate_portfolio_cache()
+    return response
+
 # ==================== I18N CONTEXT PROCESSOR ====================
 @app.context_processor
 def inject_language():
@@ -339,7 +348,7 @@ def admin_logout():
 @admin_required
 def admin_dashboard():
     """Admin dashboard"""
-    data = load_portfolio_data(PORTFOLIO_DATA_PATH)
+    data = load_portfolio_data(PORTFOLIO_DATA_PATH, fresh=True)
     analytics_summary = get_analytics_summary(ANALYTICS_DATA_PATH)
     return render_template('admin/dashboard.html', data=data, analytics_summary=analytics_summary)
 
@@ -349,7 +358,7 @@ def admin_dashboard():
 @admin_required
 def admin_personal_info():
     """Update personal information"""
-    data = load_portfolio_data(PORTFOLIO_DATA_PATH)
+    data = load_portfolio_data(PORTFOLIO_DATA_PATH, fresh=True)
     
     if request.method == 'POST':
         db = get_db()
@@ -385,7 +394,7 @@ def admin_personal_info():
 @admin_required
 def admin_academic():
     """List all academic entries"""
-    data = load_portfolio_data(PORTFOLIO_DATA_PATH)
+    data = load_portfolio_data(PORTFOLIO_DATA_PATH, fresh=True)
     return render_template('admin/academic.html', data=data)
 
 @app.route('/admin/academic/add', methods=['GET', 'POST'])
@@ -416,7 +425,7 @@ def admin_academic_add():
 @admin_required
 def admin_academic_edit(item_id):
     """Edit academic entry"""
-    data = load_portfolio_data(PORTFOLIO_DATA_PATH)
+    data = load_portfolio_data(PORTFOLIO_DATA_PATH, fresh=True)
     academic = data.get('academic', [])
     entry = get_item_by_id(academic, item_id)
     
@@ -463,7 +472,7 @@ def admin_academic_delete(item_id):
 @admin_required
 def admin_work_experience():
     """List all work experience entries"""
-    data = load_portfolio_data(PORTFOLIO_DATA_PATH)
+    data = load_portfolio_data(PORTFOLIO_DATA_PATH, fresh=True)
     return render_template('admin/work_experience.html', data=data)
 
 @app.route('/admin/work-experience/add', methods=['GET', 'POST'])
@@ -500,7 +509,7 @@ def admin_work_experience_add():
 @admin_required
 def admin_work_experience_edit(item_id):
     """Edit work experience entry"""
-    data = load_portfolio_data(PORTFOLIO_DATA_PATH)
+    data = load_portfolio_data(PORTFOLIO_DATA_PATH, fresh=True)
     work_experience = data.get('work_experience', [])
     entry = get_item_by_id(work_experience, item_id)
     
@@ -553,7 +562,7 @@ def admin_work_experience_delete(item_id):
 @admin_required
 def admin_projects():
     """List all projects"""
-    data = load_portfolio_data(PORTFOLIO_DATA_PATH)
+    data = load_portfolio_data(PORTFOLIO_DATA_PATH, fresh=True)
     return render_template('admin/projects.html', data=data)
 
 @app.route('/admin/projects/add', methods=['GET', 'POST'])
@@ -590,7 +599,7 @@ def admin_projects_add():
 @admin_required
 def admin_projects_edit(item_id):
     """Edit project"""
-    data = load_portfolio_data(PORTFOLIO_DATA_PATH)
+    data = load_portfolio_data(PORTFOLIO_DATA_PATH, fresh=True)
     projects = data.get('projects', [])
     entry = get_item_by_id(projects, item_id)
     
@@ -627,7 +636,7 @@ def admin_projects_edit(item_id):
 @admin_required
 def admin_projects_delete(item_id):
     """Delete project"""
-    data = load_portfolio_data(PORTFOLIO_DATA_PATH)
+    data = load_portfolio_data(PORTFOLIO_DATA_PATH, fresh=True)
     projects = data.get('projects', [])
     project = get_item_by_id(projects, item_id)
     
@@ -651,7 +660,7 @@ def admin_projects_delete(item_id):
 @admin_required
 def admin_project_screenshots(item_id):
     """Manage project screenshots"""
-    data = load_portfolio_data(PORTFOLIO_DATA_PATH)
+    data = load_portfolio_data(PORTFOLIO_DATA_PATH, fresh=True)
     projects = data.get('projects', [])
     project = get_item_by_id(projects, item_id)
     
@@ -690,7 +699,7 @@ def admin_project_screenshots(item_id):
 @admin_required
 def admin_project_screenshot_delete(item_id, screenshot_id):
     """Delete a project screenshot"""
-    data = load_portfolio_data(PORTFOLIO_DATA_PATH)
+    data = load_portfolio_data(PORTFOLIO_DATA_PATH, fresh=True)
     projects = data.get('projects', [])
     project = get_item_by_id(projects, item_id)
     
@@ -722,7 +731,7 @@ def admin_project_screenshot_delete(item_id, screenshot_id):
 @admin_required
 def admin_skills():
     """List all skills"""
-    data = load_portfolio_data(PORTFOLIO_DATA_PATH)
+    data = load_portfolio_data(PORTFOLIO_DATA_PATH, fresh=True)
     return render_template('admin/skills.html', data=data)
 
 @app.route('/admin/skills/add', methods=['GET', 'POST'])
@@ -753,7 +762,7 @@ def admin_skills_add():
 @admin_required
 def admin_skills_edit(item_id):
     """Edit skill"""
-    data = load_portfolio_data(PORTFOLIO_DATA_PATH)
+    data = load_portfolio_data(PORTFOLIO_DATA_PATH, fresh=True)
     skills = data.get('skills', [])
     entry = get_item_by_id(skills, item_id)
     
@@ -800,7 +809,7 @@ def admin_skills_delete(item_id):
 @admin_required
 def admin_certifications():
     """List all certifications"""
-    data = load_portfolio_data(PORTFOLIO_DATA_PATH)
+    data = load_portfolio_data(PORTFOLIO_DATA_PATH, fresh=True)
     return render_template('admin/certifications.html', data=data)
 
 @app.route('/admin/certifications/add', methods=['GET', 'POST'])
@@ -832,7 +841,7 @@ def admin_certifications_add():
 @admin_required
 def admin_certifications_edit(item_id):
     """Edit certification"""
-    data = load_portfolio_data(PORTFOLIO_DATA_PATH)
+    data = load_portfolio_data(PORTFOLIO_DATA_PATH, fresh=True)
     certifications = data.get('certifications', [])
     entry = get_item_by_id(certifications, item_id)
     
@@ -880,7 +889,7 @@ def admin_certifications_delete(item_id):
 @admin_required
 def admin_cv():
     """Manage CV upload"""
-    data = load_portfolio_data(PORTFOLIO_DATA_PATH)
+    data = load_portfolio_data(PORTFOLIO_DATA_PATH, fresh=True)
     
     if request.method == 'POST':
         if 'cv_file' in request.files:
@@ -912,7 +921,7 @@ def admin_cv():
 @admin_required
 def admin_cv_delete():
     """Delete CV file"""
-    data = load_portfolio_data(PORTFOLIO_DATA_PATH)
+    data = load_portfolio_data(PORTFOLIO_DATA_PATH, fresh=True)
     cv_file = data.get('cv_file')
     
     if cv_file:
@@ -937,7 +946,7 @@ def admin_cv_delete():
 @admin_required
 def admin_messages():
     """View all messages"""
-    data = load_portfolio_data(PORTFOLIO_DATA_PATH)
+    data = load_portfolio_data(PORTFOLIO_DATA_PATH, fresh=True)
     messages = data.get('messages', [])
     # Sort by date, newest first
     messages.sort(key=lambda x: x.get('date', ''), reverse=True)
@@ -947,7 +956,7 @@ def admin_messages():
 @admin_required
 def admin_message_view(message_id):
     """View a specific message"""
-    data = load_portfolio_data(PORTFOLIO_DATA_PATH)
+    data = load_portfolio_data(PORTFOLIO_DATA_PATH, fresh=True)
     messages = data.get('messages', [])
     message = get_item_by_id(messages, message_id)
     
@@ -983,7 +992,7 @@ def admin_message_delete(message_id):
 @admin_required
 def admin_message_mark_read(message_id):
     """Mark message as read/unread"""
-    data = load_portfolio_data(PORTFOLIO_DATA_PATH)
+    data = load_portfolio_data(PORTFOLIO_DATA_PATH, fresh=True)
     messages = data.get('messages', [])
     message = get_item_by_id(messages, message_id)
     
@@ -1021,6 +1030,12 @@ def admin_analytics_reset():
         flash('Error resetting analytics data.', 'error')
     return redirect(url_for('admin_analytics'))
 
+@app.route('/admin/cache-stats')
+@admin_required
+def admin_cache_stats():
+    """Hit/miss counters for the in-process data caches"""
+    return jsonify(get_cache_stats())
+
 # ==================== ADMIN - DATABASE EXPLORER ====================
 
 @app.route('/admin/database')
@@ -1134,10 +1149,17 @@ def admin_translations_update(language):
     translations = load_translations()
     
     # Get all form data
+    updates = {}
     for key, value in request.form.items():
         if key.startswith('translation_'):
             translation_key = key.replace('translation_', '').replace('_', '.')
-            if update_translation(language, translation_key, value):
+            updates[translation_key] = value
+    
+    # One copy, serialize and fsync for the whole form instead of one per field
+    if updates:
+        saved = update_translations(language, updates)
+        for translation_key in updates:
+            if saved:
                 flash(f'Translation updated: {translation_key}', 'success')
             else:
                 flash(f'Error updating: {translation_key}', 'error')
@@ -1165,6 +1187,25 @@ def admin_export():
         flash('Error exporting portfolio data.', 'error')
         return redirect(url_for('admin_dashboard'))
 
+@app.route('/admin/export-db', methods=['POST'])
+@admin_required
+def admin_export_db():
+    """Download a binary backup of the SQLite database"""
+    from flask import send_file
+    import io
+    
+    backup = export_portfolio_db()
+    if backup is not None:
+        return send_file(
+            io.BytesIO(backup),
+            mimetype='application/vnd.sqlite3',
+            as_attachment=True,
+            download_name='portfolio_backup.db'
+        )
+    else:
+        flash('Error backing up database.', 'error')
+        return redirect(url_for('admin_dashboard'))
+
 @app.route('/admin/import', methods=['POST'])
 @admin_required
 def admin_import():
@@ -1195,7 +1236,7 @@ def admin_import():
 @admin_required
 def admin_articles():
     """List all articles"""
-    data = load_portfolio_data(PORTFOLIO_DATA_PATH)
+    data = load_portfolio_data(PORTFOLIO_DATA_PATH, fresh=True)
     articles = data.get('articles', [])
     # Sort by date, newest first
     articles.sort(key=lambda x: x.get('published_date', ''), reverse=True)
@@ -1206,7 +1247,7 @@ def admin_articles():
 def admin_articles_add():
     """Add new article"""
     if request.method == 'POST':
-        data = load_portfolio_data(PORTFOLIO_DATA_PATH)
+        data = load_portfolio_data(PORTFOLIO_DATA_PATH, fresh=True)
         articles = data.get('articles', [])
         
         title = request.form.get('title', '').strip()
@@ -1249,7 +1290,7 @@ def admin_articles_add():
 @admin_required
 def admin_articles_edit(item_id):
     """Edit article"""
-    data = load_portfolio_data(PORTFOLIO_DATA_PATH)
+    data = load_portfolio_data(PORTFOLIO_DATA_PATH, fresh=True)
     articles = data.get('articles', [])
     entry = get_item_by_id(articles, item_id)
     
@@ -1312,7 +1353,7 @@ def admin_articles_delete(item_id):
 @admin_required
 def admin_testimonials():
     """List all testimonials"""
-    data = load_portfolio_data(PORTFOLIO_DATA_PATH)
+    data = load_portfolio_data(PORTFOLIO_DATA_PATH, fresh=True)
     testimonials = data.get('testimonials', [])
     # Sort by date, newest first
     testimonials.sort(key=lambda x: x.get('date', ''), reverse=True)
@@ -1323,7 +1364,7 @@ def admin_testimonials():
 def admin_testimonials_add():
     """Add new testimonial"""
     if request.method == 'POST':
-        data = load_portfolio_data(PORTFOLIO_DATA_PATH)
+        data = load_portfolio_data(PORTFOLIO_DATA_PATH, fresh=True)
         testimonials = data.get('testimonials', [])
         
         from datetime import datetime
@@ -1354,7 +1395,7 @@ def admin_testimonials_add():
 @admin_required
 def admin_testimonials_edit(item_id):
     """Edit testimonial"""
-    data = load_portfolio_data(PORTFOLIO_DATA_PATH)
+    data = load_portfolio_data(PORTFOLIO_DATA_PATH, fresh=True)
     testimonials = data.get('testimonials', [])
     entry = get_item_by_id(testimonials, item_id)
     
@@ -8,24 +8,44 @@ to request each route, then writes the HTML to the appropriate output path
 so Netlify can serve the site as a static site.
 
 Usage:
-  python export_static.py
+  python export_static.py                 # wipe dist/ and re-render everything
+  python export_static.py --incremental   # skip rendering if no input changed
 
 Notes:
  - Ensure any dynamic routes (projects, blog posts) are exported by reading
    `portfolio_data.json` and creating the per-item pages.
  - The script will create `dist/` directory and copy `static/` into it.
+ - `--incremental` fingerprints the rendered inputs (portfolio content from
+   the database, `portfolio_data.json`, `translations.json`, the Python
+   sources, templates and the route list) into `dist/.export-stamp`. Pages are re-rendered only
+   when that fingerprint changes. Every page shows shared content such as
+   personal info, so any change re-renders all routes.
 """
 
+import argparse
+import hashlib
 import os
 import shutil
 import errno
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from app import app
+from utils import get_db
 import json
 
 ROOT = Path(__file__).parent
 DIST = ROOT / 'dist'
+STAMP_FILE = DIST / '.export-stamp'
+
+# One test client per worker thread
+_local = threading.local()
+
+def get_client():
+    if not hasattr(_local, 'client'):
+        _local.client = app.test_client()
+    return _local.client
 
 def ensure_dir(path: Path):
     path.mkdir(parents=True, exist_ok=True)
@@ -34,26 +54,86 @@ def write_file(path: Path, content: str):
     ensure_dir(path.parent)
     path.write_text(content, encoding='utf-8')
 
-def fetch_and_write(client, route: str, out_path: Path):
+def link_or_copy(src, dst):
+    """Hardlink src to dst, falling back to a real copy.
+
+    Linking fails across filesystems (EXDEV) or on filesystems without
+    hardlink support; copy the bytes in that case.
+    """
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+    return dst
+
+def route_output_path(route: str) -> Path:
+    if route == '/':
+        return DIST / 'index.html'
+    # strip leading slash
+    sub = route.lstrip('/')
+    return DIST / sub / 'index.html'
+
+def fetch_and_write(client, route: str, out_path: Path) -> bool:
+    """Render route into out_path; return False if it answered with an error status"""
     print(f"Fetching {route} -> {out_path}")
     resp = client.get(route)
-    if resp.status_code >= 400:
+    ok = resp.status_code < 400
+    if not ok:
         print(f"Warning: {route} returned status {resp.status_code}")
     content = resp.get_data(as_text=True)
     write_file(out_path, content)
+    return ok
+
+def input_fingerprint(data_file: Path, routes: set) -> str:
+    """sha256 over everything that feeds the rendered pages"""
+    h = hashlib.sha256()
+    # Content lives in SQLite; hash the data itself, not the file, since
+    # page-view tracking rewrites the database on every export
+    content = get_db().load_portfolio_data()
+    h.update(json.dumps(content, sort_keys=True, default=str).encode('utf-8'))
+    inputs = [data_file, ROOT / 'translations.json']
+    # app.py, utils.py, i18n.py, config.py, ... all shape the rendered HTML
+    inputs.extend(sorted(ROOT.glob('*.py')))
+    inputs.extend(sorted((ROOT / 'templates').rglob('*.html')))
+    for path in inputs:
+        if path.exists():
+            h.update(str(path.relative_to(ROOT)).encode('utf-8'))
+            h.update(path.read_bytes())
+    h.update('\n'.join(sorted(routes)).encode('utf-8'))
+    return h.hexdigest()
+
+def prune_stale_routes(keep: set):
+    """Remove exported pages whose route is no longer exported"""
+    keep_paths = {route_output_path(route) for route in keep}
+    for page in list(DIST.rglob('index.html')):
+        if page.is_relative_to(DIST / 'static') or page in keep_paths:
+            continue
+        print(f"Removing stale page {page}")
+        page.unlink()
+        parent = page.parent
+        while parent != DIST and not any(parent.iterdir()):
+            parent.rmdir()
+            parent = parent.parent
 
 def main():
+    parser = argparse.ArgumentParser(description='Export the portfolio as a static site.')
+    parser.add_argument('--incremental', action='store_true',
+                        help='keep dist/ and skip rendering when no input changed')
+    args = parser.parse_args()
+
     # Remove old dist
-    if DIST.exists():
+    if not args.incremental and DIST.exists():
         shutil.rmtree(DIST)
     ensure_dir(DIST)
 
-    # Copy static assets
+    # Copy static assets (hardlinks are cheap, so always refresh them)
     static_src = ROOT / 'static'
     static_dst = DIST / 'static'
+    if static_dst.exists():
+        shutil.rmtree(static_dst)
     if static_src.exists():
         print('Copying static/ to dist/static/')
-        shutil.copytree(static_src, static_dst)
+        shutil.copytree(static_src, static_dst, copy_function=link_or_copy)
     else:
         print('No static/ directory found; skipping asset copy')
 
@@ -64,9 +144,6 @@ def main():
     else:
         data = {}
 
-    # Instantiate test client
-    client = app.test_client()
-
     # Routes to export (top-level)
     routes = ['/', '/projects', '/about', '/contact', '/skills', '/certifications', '/education', '/blog']
 
@@ -82,21 +159,41 @@ def main():
         if slug:
             routes.append(f'/blog/{slug}')
 
-    # Export each route into dist/<route>/index.html (so Netlify serves it correctly)
-    for route in sorted(set(routes)):
-        if route == '/':
-            out = DIST / 'index.html'
+    routes = set(routes)
+    pending = sorted(routes)
+    fingerprint = None
+    if args.incremental:
+        prune_stale_routes(routes)
+        fingerprint = input_fingerprint(data_file, routes)
+        if STAMP_FILE.exists() and STAMP_FILE.read_text(encoding='utf-8') == fingerprint:
+            pending = []
         else:
-            # strip leading slash
-            sub = route.lstrip('/')
-            out = DIST / sub / 'index.html'
-        fetch_and_write(client, route, out)
+            # Drop the stamp first so an interrupted render is redone next time
+            STAMP_FILE.unlink(missing_ok=True)
+    print(f"Rendering {len(pending)} of {len(routes)} routes")
+
+    # Export each route into dist/<route>/index.html (so Netlify serves it correctly).
+    # Routes are independent, so render them in parallel.
+    def export_route(route: str) -> bool:
+        return fetch_and_write(get_client(), route, route_output_path(route))
+
+    max_workers = min(32, (os.cpu_count() or 1) + 4)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # Iterating the results re-raises the first exception from any worker
+        failed = [route for route, ok in zip(pending, executor.map(export_route, pending)) if not ok]
+
+    if failed:
+        # No stamp, so the next --incremental run renders these again
+        print(f"Warning: {len(failed)} route(s) failed: {', '.join(failed)}")
+    elif fingerprint is not None:
+        STAMP_FILE.write_text(fingerprint, encoding='utf-8')
 
     # Also copy robots and favicon if present in root
     for fname in ['robots.txt', 'favicon.ico']:
         fp = ROOT / fname
         if fp.exists():
-            shutil.copy(fp, DIST / fname)
+            (DIST / fname).unlink(missing_ok=True)
+            link_or_copy(fp, DIST / fname)
 
     print('Static export complete. Output in dist/')
 
@@ -1,12 +1,13 @@
 """
 Internationalization (i18n) utilities for multi-language support
 """
+import copy
 import json
 import os
 from pathlib import Path
 from typing import Dict, Any, Optional
 from functools import wraps
-from flask import session, request
+from flask import session, request, g
 
 # Translation file path
 TRANSLATIONS_PATH = Path(__file__).parent / 'translations.json'
@@ -20,42 +21,88 @@ SUPPORTED_LANGUAGES = {
 
 DEFAULT_LANGUAGE = 'en'
 
+# (mtime_ns, parsed translations, flattened translations) of the last file read
+_translations_cache = None
+
 def load_translations() -> Dict[str, Any]:
-    """Load translations from JSON file"""
-    if not TRANSLATIONS_PATH.exists():
+    """Load translations from JSON file (re-parsed only when the file changes)"""
+    global _translations_cache
+    try:
+        mtime = TRANSLATIONS_PATH.stat().st_mtime_ns
+    except FileNotFoundError:
         # Initialize with default translations
         default_translations = get_default_translations()
         save_translations(default_translations)
         return default_translations
     
+    cached = _translations_cache
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    
     try:
         with open(TRANSLATIONS_PATH, 'r', encoding='utf-8') as f:
-            return json.load(f)
+            translations = json.load(f)
     except (json.JSONDecodeError, IOError) as e:
         print(f"Error loading translations: {e}")
         return get_default_translations()
+    
+    _translations_cache = (mtime, translations, _flatten_languages(translations))
+    return translations
+
+def _flatten(tree: Dict[str, Any], prefix: str = ''):
+    """Yield ('nav.home', value) pairs for every node of a nested tree"""
+    for k, v in tree.items():
+        path = prefix + k
+        yield path, v
+        if isinstance(v, dict):
+            yield from _flatten(v, path + '.')
+
+def _flatten_languages(translations: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Map each language to a flat {dotted key: value} dict"""
+    return {
+        lang: dict(_flatten(tree))
+        for lang, tree in translations.items()
+        if isinstance(tree, dict)
+    }
+
+def _load_flat_translations() -> Dict[str, Dict[str, Any]]:
+    """Flattened form of load_translations()"""
+    translations = load_translations()
+    cached = _translations_cache
+    if cached is not None and cached[1] is translations:
+        return cached[2]
+    # Defaults returned because the file is missing or unreadable
+    return _flatten_languages(translations)
+
+def _write_durably(path: Path, payload: bytes) -> None:
+    """Write payload to path with raw os.write calls and fsync before returning"""
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+    fd = os.open(path, flags, 0o644)
+    try:
+        view = memoryview(payload)
+        while view:
+            view = view[os.write(fd, view):]
+        os.fsync(fd)
+    finally:
+        os.close(fd)
 
 def save_translations(translations: Dict[str, Any]) -> bool:
     """Save translations to JSON file atomically"""
-    import os
+    global _translations_cache
+    temp_path = TRANSLATIONS_PATH.with_suffix('.json.tmp')
     try:
-        temp_path = TRANSLATIONS_PATH.with_suffix('.json.tmp')
-        with open(temp_path, 'w', encoding='utf-8') as f:
-            json.dump(translations, f, indent=2, ensure_ascii=False)
+        payload = json.dumps(translations, indent=2, ensure_ascii=False).encode('utf-8')
+        _write_durably(temp_path, payload)
         
-        if os.name == 'nt':  # Windows
-            if TRANSLATIONS_PATH.exists():
-                os.replace(temp_path, TRANSLATIONS_PATH)
-            else:
-                temp_path.rename(TRANSLATIONS_PATH)
-        else:  # Unix-like
-            os.replace(temp_path, TRANSLATIONS_PATH)
+        # os.replace overwrites atomically on both POSIX and Windows
+        os.replace(temp_path, TRANSLATIONS_PATH)
         
+        # Force a re-read even if the new file lands on the same mtime tick
+        _translations_cache = None
         return True
     except Exception as e:
         print(f"Error saving translations: {e}")
-        if temp_path.exists():
-            temp_path.unlink()
+        temp_path.unlink(missing_ok=True)
         return False
 
 def get_default_translations() -> Dict[str, Any]:
@@ -234,24 +281,27 @@ def set_language(language: str) -> None:
     """Set language in session"""
     if language in SUPPORTED_LANGUAGES:
         session['language'] = language
+        # Drop translations already resolved for this request
+        g.pop('_translations', None)
+
+def get_request_translations() -> Dict[str, Any]:
+    """Flat translations for the current language, resolved once per request"""
+    if '_translations' not in g:
+        flat = _load_flat_translations()
+        language = get_current_language()
+        g._translations = flat.get(language, flat.get(DEFAULT_LANGUAGE, {}))
+    return g._translations
 
 def get_translation(key: str, language: Optional[str] = None) -> str:
     """Get translation for a key in the specified or current language"""
     if language is None:
-        language = get_current_language()
-    
-    translations = load_translations()
-    lang_translations = translations.get(language, translations.get(DEFAULT_LANGUAGE, {}))
-    
-    # Navigate nested keys (e.g., 'nav.home')
-    keys = key.split('.')
-    value = lang_translations
-    for k in keys:
-        if isinstance(value, dict):
-            value = value.get(k)
-        else:
-            return key  # Return key if translation not found
+        lang_translations = get_request_translations()
+    else:
+        flat = _load_flat_translations()
+        lang_translations = flat.get(language, flat.get(DEFAULT_LANGUAGE, {}))
     
+    # Dotted keys (e.g., 'nav.home') were flattened at load time
+    value = lang_translations.get(key)
     return value if value else key
 
 def get_translations_for_language(language: str) -> Dict[str, Any]:
@@ -261,21 +311,27 @@ def get_translations_for_language(language: str) -> Dict[str, Any]:
 
 def update_translation(language: str, key: str, value: str) -> bool:
     """Update a translation"""
-    translations = load_translations()
+    return update_translations(language, {key: value})
+
+def update_translations(language: str, updates: Dict[str, str]) -> bool:
+    """Update several translations of one language with a single save"""
+    # Copy so a failed save does not leave the shared cached dict modified
+    translations = copy.deepcopy(load_translations())
     
     if language not in translations:
         translations[language] = {}
     
-    # Navigate nested keys
-    keys = key.split('.')
-    current = translations[language]
-    
-    for k in keys[:-1]:
-        if k not in current:
-            current[k] = {}
-        current = current[k]
-    
-    current[keys[-1]] = value
+    for key, value in updates.items():
+        # Navigate nested keys
+        keys = key.split('.')
+        current = translations[language]
+        
+        for k in keys[:-1]:
+            if k not in current:
+                current[k] = {}
+            current = current[k]
+        
+        current[keys[-1]] = value
     
     return save_translations(translations)
 
@@ -1,32 +1,123 @@
 """
 Utility functions for SQLite database operations and file handling
 """
+import itertools
 import json
 import os
+import re
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Mapping, Union
 from werkzeug.utils import secure_filename
 import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+import atexit
 from datetime import datetime, date
-from collections import defaultdict
+from collections import defaultdict, deque, Counter
 from database import Database
 
+# Slug patterns, compiled once
+_SLUG_STRIP = re.compile(r'[^\w\s-]')
+_SLUG_DASH = re.compile(r'[-\s]+')
+
+# Monotonic ID source: millisecond start time shifted left 16 bits, then +1 per
+# ID, so a restarted process cannot reissue IDs unless the previous run handed
+# out more than 65536 per millisecond. The process id suffix keeps IDs from
+# separate worker processes apart.
+_id_counter = itertools.count(int(time.time() * 1000) << 16)
+_id_suffix = format(os.getpid(), 'x')
+
+def _reset_id_suffix() -> None:
+    global _id_suffix
+    _id_suffix = format(os.getpid(), 'x')
+
+# Forked workers (e.g. gunicorn --preload) need their own suffix; no fork on Windows
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_id_suffix)
+
 # Global database instance (initialized on first use)
 _db_instance = None
+_db_instance_lock = threading.Lock()
 
 def get_db() -> Database:
     """Get or create database instance"""
     global _db_instance
     if _db_instance is None:
-        from config import DATABASE_PATH
-        _db_instance = Database(DATABASE_PATH)
+        # Double-checked so concurrent first requests build only one instance
+        with _db_instance_lock:
+            if _db_instance is None:
+                from config import DATABASE_PATH
+                db = Database(DATABASE_PATH)
+                _enable_wal(db)
+                _db_instance = db
     return _db_instance
 
-def load_portfolio_data(file_path: Path = None) -> Dict[str, Any]:
-    """Load portfolio data from SQLite database"""
+def _enable_wal(db: Database) -> None:
+    """Switch the database file to WAL journaling.
+
+    journal_mode=WAL is stored in the database file itself, so every
+    connection Database opens afterwards writes to the WAL instead of the
+    rollback journal.
+    """
+    try:
+        with db.get_connection() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+    except Exception as e:
+        print(f"Error enabling WAL mode: {e}")
+
+# Hit/miss counters for the in-process caches (see get_cache_stats)
+_cache_stats = Counter()
+
+def get_cache_stats() -> Dict[str, Any]:
+    """Cache hit/miss counters plus overall totals and hit rate"""
+    hits = sum(v for k, v in _cache_stats.items() if k.endswith('_hit'))
+    misses = sum(v for k, v in _cache_stats.items() if k.endswith('_miss'))
+    lookups = hits + misses
+    return {
+        'counters': dict(_cache_stats),
+        'total_hits': hits,
+        'total_misses': misses,
+        'hit_rate_pct': round(hits / lookups * 100, 2) if lookups else 0.0
+    }
+
+# Seconds loaded portfolio data is reused for. Writers call
+# invalidate_portfolio_cache(); the TTL bounds staleness across worker processes.
+PORTFOLIO_CACHE_TTL = 60
+_portfolio_cache = {"data": None, "ts": 0.0, "indexes": {}, "generation": 0}
+# Source of invalidation generations (next() is atomic, unlike += 1)
+_portfolio_generations = itertools.count(1)
+
+def invalidate_portfolio_cache() -> None:
+    """Drop the cached portfolio data"""
+    # A load already in flight sees the new generation and won't store its
+    # pre-write snapshot
+    _portfolio_cache["generation"] = next(_portfolio_generations)
+    _portfolio_cache["data"] = None
+
+def load_portfolio_data(file_path: Path = None, fresh: bool = False) -> Dict[str, Any]:
+    """Load portfolio data from SQLite database.
+
+    Results are shared between callers for PORTFOLIO_CACHE_TTL seconds and
+    must be treated as read-only. Pass fresh=True to get a private copy
+    straight from the database (e.g. before editing entries in place).
+    """
+    if not fresh:
+        cached = _portfolio_cache["data"]
+        if cached is not None and time.monotonic() - _portfolio_cache["ts"] < PORTFOLIO_CACHE_TTL:
+            _cache_stats['portfolio_hit'] += 1
+            return cached
+        _cache_stats['portfolio_miss'] += 1
+    generation = _portfolio_cache["generation"]
     try:
         db = get_db()
-        return db.load_portfolio_data()
+        data = db.load_portfolio_data()
+        if not fresh and _portfolio_cache["generation"] == generation:
+            _portfolio_cache["indexes"] = {}
+            _portfolio_cache["data"] = data
+            _portfolio_cache["ts"] = time.monotonic()
+        return data
     except Exception as e:
         print(f"Error loading portfolio data: {e}")
         return {
@@ -49,6 +140,7 @@ def save_portfolio_data(file_path: Path, data: Dict[str, Any]) -> bool:
         # Save personal info
         if "personal_info" in data:
             db.save_personal_info(data["personal_info"], data.get("cv_file"))
+            invalidate_portfolio_cache()
         
         # Note: Individual CRUD operations should be used for adding/updating/deleting items
         # This function is kept for compatibility but should ideally use specific methods
@@ -57,23 +149,43 @@ def save_portfolio_data(file_path: Path, data: Dict[str, Any]) -> bool:
         print(f"Error saving portfolio data: {e}")
         return False
 
-def get_item_by_id(items: List[Dict], item_id: str) -> Optional[Dict]:
-    """Get an item by its ID from a list"""
+def build_id_index(items: List[Dict]) -> Dict[str, Dict]:
+    """Build an {id: item} index for repeated lookups on the same list"""
+    # Reversed so the first item wins on duplicate ids, like a linear scan
+    return {item.get('id'): item for item in reversed(items)}
+
+def _cached_id_index(items: List[Dict]) -> Optional[Dict[str, Dict]]:
+    """Memoized index for a list that belongs to the cached portfolio data"""
+    indexes = _portfolio_cache["indexes"]
+    entry = indexes.get(id(items))
+    if entry is None:
+        data = _portfolio_cache["data"]
+        if data is None or not any(items is section for section in data.values()):
+            return None
+        entry = indexes[id(items)] = (items, build_id_index(items))
+    # The identity check guards against id() reuse after the cache is replaced
+    return entry[1] if entry[0] is items else None
+
+def get_item_by_id(items: Union[List[Dict], Mapping[str, Dict]], item_id: str) -> Optional[Dict]:
+    """Get an item by its ID from a list or an index built by build_id_index"""
+    if isinstance(items, Mapping):
+        return items.get(item_id)
+    index = _cached_id_index(items)
+    if index is not None:
+        return index.get(item_id)
     return next((item for item in items if item.get('id') == item_id), None)
 
 def generate_id() -> str:
     """Generate a unique ID"""
-    import time
-    return str(int(time.time() * 1000))
+    return f"{next(_id_counter):x}{_id_suffix}"
 
 def generate_slug(text: str) -> str:
     """Generate a URL-friendly slug from text"""
-    import re
     # Convert to lowercase
     slug = text.lower()
     # Replace spaces and special characters with hyphens
-    slug = re.sub(r'[^\w\s-]', '', slug)
-    slug = re.sub(r'[-\s]+', '-', slug)
+    slug = _SLUG_STRIP.sub('', slug)
+    slug = _SLUG_DASH.sub('-', slug)
     # Remove leading/trailing hyphens
     slug = slug.strip('-')
     return slug
@@ -83,65 +195,67 @@ def allowed_file(filename: str, allowed_extensions: set) -> bool:
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in allowed_extensions
 
-def save_cv_file(file, upload_folder: Path) -> Optional[str]:
-    """Save uploaded CV file and return the filename"""
-    if file and allowed_file(file.filename, {'pdf', 'doc', 'docx'}):
-        filename = secure_filename(file.filename)
-        # Ensure unique filename
-        file_path = upload_folder / filename
-        counter = 1
-        while file_path.exists():
-            name, ext = os.path.splitext(filename)
-            filename = f"{name}_{counter}{ext}"
-            file_path = upload_folder / filename
+def _create_unique(upload_folder: Path, filename: str):
+    """Create filename in upload_folder, suffixed with _1, _2, ... if it is taken.
+
+    Returns (filename, file opened for binary writing). Opening with 'xb'
+    lets the filesystem decide what "taken" means, so case-insensitive
+    filesystems and concurrent uploads cannot overwrite an existing file.
+    """
+    name, ext = os.path.splitext(filename)
+    candidate = filename
+    counter = 1
+    while True:
+        try:
+            return candidate, open(os.path.join(upload_folder, candidate), 'xb')
+        except FileExistsError:
+            candidate = f"{name}_{counter}{ext}"
             counter += 1
-        
-        file.save(str(file_path))
+
+# Accepted upload extensions per kind
+_CV_EXTENSIONS = frozenset(('pdf', 'doc', 'docx'))
+_IMAGE_EXTENSIONS = frozenset(('jpg', 'jpeg', 'png', 'gif', 'webp'))
+_UPLOAD_COPY_BUFSIZE = 1 << 20
+
+def save_upload(file, upload_folder: Path, allowed_extensions) -> Optional[str]:
+    """Save an uploaded file under a unique name and return the filename"""
+    if file and allowed_file(file.filename, allowed_extensions):
+        filename, dst = _create_unique(upload_folder, secure_filename(file.filename))
+        # Copy in 1 MiB chunks rather than FileStorage.save()'s 16 KiB default
+        with dst:
+            shutil.copyfileobj(file.stream, dst, length=_UPLOAD_COPY_BUFSIZE)
         return filename
     return None
 
+def delete_upload(filename: str, upload_folder: Path, label: str = 'file') -> bool:
+    """Delete an uploaded file; label is used in the error message"""
+    if filename:
+        # A single unlink; a missing file is reported as False, as before
+        try:
+            (upload_folder / filename).unlink()
+            return True
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            print(f"Error deleting {label}: {e}")
+            return False
+    return False
+
+def save_cv_file(file, upload_folder: Path) -> Optional[str]:
+    """Save uploaded CV file and return the filename"""
+    return save_upload(file, upload_folder, _CV_EXTENSIONS)
+
 def save_screenshot(file, upload_folder: Path) -> Optional[str]:
     """Save uploaded screenshot image and return the filename"""
-    if file and allowed_file(file.filename, {'jpg', 'jpeg', 'png', 'gif', 'webp'}):
-        filename = secure_filename(file.filename)
-        # Ensure unique filename
-        file_path = upload_folder / filename
-        counter = 1
-        while file_path.exists():
-            name, ext = os.path.splitext(filename)
-            filename = f"{name}_{counter}{ext}"
-            file_path = upload_folder / filename
-            counter += 1
-        
-        file.save(str(file_path))
-        return filename
-    return None
+    return save_upload(file, upload_folder, _IMAGE_EXTENSIONS)
 
 def delete_screenshot(filename: str, upload_folder: Path) -> bool:
     """Delete screenshot file"""
-    if filename:
-        file_path = upload_folder / filename
-        if file_path.exists():
-            try:
-                file_path.unlink()
-                return True
-            except Exception as e:
-                print(f"Error deleting screenshot: {e}")
-                return False
-    return False
+    return delete_upload(filename, upload_folder, 'screenshot')
 
 def delete_cv_file(filename: str, upload_folder: Path) -> bool:
     """Delete CV file"""
-    if filename:
-        file_path = upload_folder / filename
-        if file_path.exists():
-            try:
-                file_path.unlink()
-                return True
-            except Exception as e:
-                print(f"Error deleting CV file: {e}")
-                return False
-    return False
+    return delete_upload(filename, upload_folder, 'CV file')
 
 def export_portfolio_data(file_path: Path, export_path: Path) -> bool:
     """Export portfolio data to a backup file"""
@@ -152,17 +266,73 @@ def export_portfolio_data(file_path: Path, export_path: Path) -> bool:
         print(f"Error exporting portfolio data: {e}")
         return False
 
+# Tables left out of binary backups (password hashes)
+_BACKUP_EXCLUDED_TABLES = ('admin_users',)
+
+def _serialize_db(conn: sqlite3.Connection) -> bytes:
+    """Return the bytes of conn's database file"""
+    if hasattr(conn, 'serialize'):
+        return conn.serialize()
+    # Connection.serialize() is Python 3.11+; before that, back up into a
+    # private (0600) temp file and read it back
+    fd, temp_path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    try:
+        out = sqlite3.connect(temp_path)
+        try:
+            conn.backup(out)
+        finally:
+            out.close()
+        return Path(temp_path).read_bytes()
+    finally:
+        os.unlink(temp_path)
+
+def export_portfolio_db() -> Optional[bytes]:
+    """Snapshot the SQLite database with SQLite's backup API and return its bytes.
+
+    The copy is made in memory (on Python < 3.11 it passes through a private
+    temp file), and admin_users is dropped (then VACUUMed away) before
+    serializing.
+    """
+    try:
+        db = get_db()
+        dst = sqlite3.connect(':memory:')
+        try:
+            with db.get_connection() as src:
+                src.backup(dst)
+            for table in _BACKUP_EXCLUDED_TABLES:
+                dst.execute(f'DROP TABLE IF EXISTS "{table}"')
+            dst.commit()
+            # Rebuild so the dropped table's pages are not left in the freelist
+            dst.execute('VACUUM')
+            return _serialize_db(dst)
+        finally:
+            dst.close()
+    except Exception as e:
+        print(f"Error exporting database: {e}")
+        return None
+
 def import_portfolio_data(file_path: Path, import_path: Path) -> bool:
     """Import portfolio data from a backup file"""
     try:
         db = get_db()
-        return db.import_portfolio_data(import_path)
+        result = db.import_portfolio_data(import_path)
+        invalidate_portfolio_cache()
+        return result
     except Exception as e:
         print(f"Error importing portfolio data: {e}")
         return False
 
 # ==================== ANALYTICS FUNCTIONS ====================
 
+# Seconds a computed analytics summary is reused for
+ANALYTICS_SUMMARY_TTL = 30
+_analytics_summary_cache = {"data": None, "ts": 0.0}
+
+def invalidate_analytics_summary() -> None:
+    """Drop the cached analytics summary"""
+    _analytics_summary_cache["data"] = None
+
 def load_analytics_data(file_path: Path = None) -> Dict[str, Any]:
     """Load analytics data from SQLite database"""
     try:
@@ -185,27 +355,88 @@ def save_analytics_data(file_path: Path, data: Dict[str, Any]) -> bool:
     # Analytics are now tracked directly in the database, this function is kept for compatibility
     return True
 
+# Seconds between analytics worker flushes
+ANALYTICS_FLUSH_INTERVAL = 0.5
+# Pending ('page', route, visitor_id) / ('section', section) events; bounded so a
+# stuck database cannot grow memory without limit (oldest events are dropped and
+# counted as analytics_events_dropped in get_cache_stats())
+_analytics_events = deque(maxlen=10000)
+_analytics_worker = None
+_analytics_worker_lock = threading.Lock()
+# Held while events are written and while analytics are reset, so an event
+# already taken off the queue cannot land after a reset
+_analytics_flush_lock = threading.Lock()
+
+def flush_analytics_events() -> None:
+    """Write all queued page/section views to the database"""
+    if not _analytics_events:
+        return
+    db = get_db()
+    with _analytics_flush_lock:
+        while True:
+            try:
+                event = _analytics_events.popleft()
+            except IndexError:
+                return
+            try:
+                if event[0] == 'page':
+                    db.track_page_view(event[1], event[2])
+                else:
+                    db.track_section_view(event[1])
+            except Exception as e:
+                print(f"Error writing analytics event: {e}")
+
+def _analytics_flush_loop() -> None:
+    while True:
+        time.sleep(ANALYTICS_FLUSH_INTERVAL)
+        try:
+            flush_analytics_events()
+        except Exception as e:
+            print(f"Error flushing analytics events: {e}")
+
+def _queue_analytics_event(event: tuple) -> None:
+    """Queue an event and make sure this process has a running worker"""
+    global _analytics_worker
+    if len(_analytics_events) == _analytics_events.maxlen:
+        # append() below pushes out the oldest queued event
+        _cache_stats['analytics_events_dropped'] += 1
+        if _cache_stats['analytics_events_dropped'] % 1000 == 1:
+            print(f"Warning: analytics queue full, {_cache_stats['analytics_events_dropped']} event(s) dropped")
+    _analytics_events.append(event)
+    worker = _analytics_worker
+    if worker is None or not worker.is_alive():
+        # Threads do not survive fork, so forked workers start their own
+        with _analytics_worker_lock:
+            if _analytics_worker is None or not _analytics_worker.is_alive():
+                _analytics_worker = threading.Thread(
+                    target=_analytics_flush_loop, name='analytics-flush', daemon=True
+                )
+                _analytics_worker.start()
+
+# Write whatever is still queued when the process exits
+atexit.register(flush_analytics_events)
+
 def track_page_view(file_path: Path, route: str, visitor_id: str = None) -> None:
-    """Track a page view"""
-    try:
-        db = get_db()
-        db.track_page_view(route, visitor_id)
-    except Exception as e:
-        print(f"Error tracking page view: {e}")
+    """Track a page view (written to the database by the background worker)"""
+    _queue_analytics_event(('page', route, visitor_id))
 
 def track_section_view(file_path: Path, section: str) -> None:
     """Track a section view (e.g., skills, projects, etc.)"""
-    try:
-        db = get_db()
-        db.track_section_view(section)
-    except Exception as e:
-        print(f"Error tracking section view: {e}")
+    _queue_analytics_event(('section', section))
 
 def get_analytics_summary(file_path: Path = None) -> Dict[str, Any]:
-    """Get analytics summary for dashboard"""
+    """Get analytics summary for dashboard (cached for ANALYTICS_SUMMARY_TTL seconds)"""
+    cached = _analytics_summary_cache["data"]
+    if cached is not None and time.monotonic() - _analytics_summary_cache["ts"] < ANALYTICS_SUMMARY_TTL:
+        _cache_stats['analytics_summary_hit'] += 1
+        return cached
+    _cache_stats['analytics_summary_miss'] += 1
     try:
         db = get_db()
-        return db.get_analytics_summary()
+        summary = db.get_analytics_summary()
+        _analytics_summary_cache["data"] = summary
+        _analytics_summary_cache["ts"] = time.monotonic()
+        return summary
     except Exception as e:
         print(f"Error getting analytics summary: {e}")
         return {
@@ -222,7 +453,12 @@ def reset_analytics(file_path: Path = None) -> bool:
     """Reset all analytics data"""
     try:
         db = get_db()
-        db.reset_analytics()
+        # Views queued before the reset must not reappear after it; the lock
+        # waits out any event the worker is writing right now
+        with _analytics_flush_lock:
+            _analytics_events.clear()
+            db.reset_analytics()
+        invalidate_analytics_summary()
         return True
     except Exception as e:
         print(f"Error resetting analytics: {e}")